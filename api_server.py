@@ -6,18 +6,27 @@ FastAPI server exposing the RAG system via REST endpoints.
 Endpoints:
 - GET  /health  → Health check
 - POST /ask     → Ask a question to the FAQ corpus
+                  (send `Accept: text/event-stream` to stream the answer via SSE)
+- POST /ask_batch → Ask several questions in one request
 """
 
 import os
+import sys
+import json
+import asyncio
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.datastructures import Headers
 
 # Import rag_core (will prompt for API key if not set)
-from rag_core import ask_faq_core
+import rag_core
+from rag_core import ask_faq_core, ask_faq_many, ask_faq_stream
 
 # --- Logging Setup ---
 logging.basicConfig(
@@ -27,12 +36,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # --- FastAPI App ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load FAQs and embeddings once per worker, before serving requests."""
+    # preload() drives its own event loop for batched embedding, so run it off this one
+    await asyncio.to_thread(rag_core.preload)
+    yield
+
+
 app = FastAPI(
     title="FAQ RAG API",
     description="Retrieval-Augmented Generation API for FAQ documents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson serializes straight to bytes, much faster than stdlib json
 )
 
+class SSEAwareGZipMiddleware:
+    """
+    GZipMiddleware that leaves Server-Sent Events uncompressed.
+    
+    Starlette < 0.46 gzips `text/event-stream` responses without flushing,
+    so every SSE delta would sit in the zlib buffer until the stream ends.
+    /ask only streams when the client sends `Accept: text/event-stream`,
+    so those requests bypass compression entirely.
+    """
+    
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "text/event-stream" in Headers(scope=scope).get("accept", ""):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
+# Compress JSON answers for clients that send `Accept-Encoding: gzip`
+# (small bodies like /health stay uncompressed)
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 
 # --- Request/Response Models ---
 class AskRequest(BaseModel):
@@ -57,6 +101,27 @@ class AskResponse(BaseModel):
     sources: list[str]
 
 
+class BatchAskRequest(BaseModel):
+    """Request body for POST /ask_batch"""
+    questions: list[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=32,
+        description="The questions to ask (1-32)"
+    )
+    top_k: Optional[int] = Field(
+        default=4,
+        ge=1,
+        le=10,
+        description="Number of chunks to retrieve per question (1-10)"
+    )
+
+
+class BatchAskResponse(BaseModel):
+    """Response body for POST /ask_batch"""
+    results: list[AskResponse]
+
+
 class HealthResponse(BaseModel):
     """Response body for GET /health"""
     status: str
@@ -67,6 +132,26 @@ class ErrorResponse(BaseModel):
     detail: str
 
 
+# --- Streaming Helpers ---
+async def _sse_events(deltas: AsyncIterator[str], sources: List[str]) -> AsyncIterator[str]:
+    """
+    Format an answer stream as Server-Sent Events.
+    
+    Each text delta is sent as `data: {"delta": ...}`; the stream ends with an
+    `event: sources` carrying `{"sources": [...]}`, or `event: error` on failure.
+    """
+    try:
+        async for delta in deltas:
+            yield f"data: {json.dumps({'delta': delta})}\n\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Streaming error: {e}", exc_info=True)
+        yield f"event: error\ndata: {json.dumps({'detail': 'Internal server error'})}\n\n"
+        return
+    
+    yield f"event: sources\ndata: {json.dumps({'sources': sources})}\n\n"
+
+
 # --- Endpoints ---
 @app.get(
     "/health",
@@ -89,18 +174,30 @@ def health():
     summary="Ask a Question",
     description="Ask a natural language question and get an answer from the FAQ corpus"
 )
-def ask(body: AskRequest):
+async def ask(body: AskRequest, request: Request):
     """
     Process a question through the RAG pipeline.
     
     - Retrieves relevant chunks from the FAQ corpus
     - Generates an answer using an LLM
     - Returns the answer with source citations
+    - Streams the answer as SSE when the client accepts `text/event-stream`
     """
     try:
         logger.info(f"Received question: {body.question[:50]}...")
         
-        result = ask_faq_core(
+        if "text/event-stream" in request.headers.get("accept", ""):
+            deltas, sources = await ask_faq_stream(
+                question=body.question.strip(),
+                top_k=body.top_k or 4
+            )
+            return StreamingResponse(
+                _sse_events(deltas, sources),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"}
+            )
+        
+        result = await ask_faq_core(
             question=body.question.strip(),
             top_k=body.top_k or 4
         )
@@ -123,12 +220,56 @@ def ask(body: AskRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post(
+    "/ask_batch",
+    response_model=BatchAskResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+    },
+    summary="Ask Several Questions",
+    description="Answer a list of questions in one request; results are returned in the same order"
+)
+async def ask_batch(body: BatchAskRequest):
+    """
+    Process several questions through the RAG pipeline at once.
+    
+    - Embeds all questions in a single embeddings request
+    - Retrieves chunks for every question with one matrix product
+    - Generates the answers concurrently
+    """
+    try:
+        logger.info(f"Received batch of {len(body.questions)} questions")
+        
+        results = await ask_faq_many(
+            questions=[q.strip() for q in body.questions],
+            top_k=body.top_k or 4
+        )
+        
+        return {
+            "results": [
+                {"answer": result["answer"], "sources": result["sources"]}
+                for result in results
+            ]
+        }
+        
+    except ValueError as e:
+        # Input validation errors
+        logger.warning(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    except Exception as e:
+        # Don't leak internal errors to client
+        logger.error(f"Internal error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # --- Error Handlers ---
 @app.exception_handler(Exception)
 async def generic_exception_handler(request, exc):
     """Catch-all exception handler."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
@@ -140,8 +281,23 @@ if __name__ == "__main__":
     
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
+    workers = int(os.getenv("WORKERS", "4"))
     
-    print(f"\n🚀 Starting FAQ RAG API at http://{host}:{port}")
+    print(f"\n🚀 Starting FAQ RAG API at http://{host}:{port} ({workers} workers)")
     print(f"📚 API docs available at http://{host}:{port}/docs\n")
     
-    uvicorn.run(app, host=host, port=port)
+    if workers > 1:
+        # Build the on-disk embedding cache, shared matrix (and HNSW index) once
+        # here, so workers starting together load them instead of each
+        # re-embedding the corpus on a cold start
+        rag_core.preload()
+    
+    # Workers need an import string; uvloop is unavailable on Windows
+    uvicorn.run(
+        "api_server:app",
+        host=host,
+        port=port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers
+    )
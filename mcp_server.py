@@ -17,7 +17,7 @@ from typing import Dict
 # Import rag_core (will prompt for API key if not set in env)
 # Note: For MCP, the key should be passed via env in the client config
 from mcp.server.fastmcp import FastMCP
-from rag_core import ask_faq_core
+from rag_core import ask_faq_core, preload_in_background
 
 # --- MCP Server Setup ---
 mcp = FastMCP(
@@ -25,9 +25,14 @@ mcp = FastMCP(
     version="1.0.0"
 )
 
+# Load embeddings in the background at import, so hosts that import this module
+# (`mcp run` / `mcp dev`) get it too. Clients can connect and list tools
+# immediately; the first ask_faq call waits for preload to finish.
+preload_in_background()
+
 
 @mcp.tool()
-def ask_faq(question: str, top_k: int = 4) -> Dict[str, object]:
+async def ask_faq(question: str, top_k: int = 4) -> Dict[str, object]:
     """
     Answer a question using the FAQ knowledge base.
     
@@ -53,7 +58,7 @@ def ask_faq(question: str, top_k: int = 4) -> Dict[str, object]:
         top_k = 4
     
     # Call the core RAG function
-    result = ask_faq_core(q, top_k=top_k)
+    result = await ask_faq_core(q, top_k=top_k)
     
     return {
         "answer": result["answer"],
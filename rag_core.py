@@ -11,12 +11,25 @@ This module handles:
 """
 
 import os
+import re
+import sys
 import json
-from typing import Dict, List, Tuple
+import asyncio
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Tuple
 from pathlib import Path
 
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+try:
+    from scipy.linalg.blas import sgemv as _sgemv
+except ImportError:  # scipy is optional; fall back to NumPy with a preallocated output
+    _sgemv = None
 
 # --- Configuration (from environment variables) ---
 FAQ_DIR = os.getenv("FAQ_DIR", str(Path(__file__).parent / "faqs"))
@@ -24,6 +37,34 @@ EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "200"))
 TOP_K_DEFAULT = int(os.getenv("TOP_K_DEFAULT", "4"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))  # Max inputs per embeddings request
+EMBED_BATCH_CHARS = int(os.getenv("EMBED_BATCH_CHARS", "200000"))  # Max characters per embeddings request
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", str(Path(FAQ_DIR) / ".embed_cache.npz"))
+EMBED_MATRIX_PATH = os.getenv("EMBED_MATRIX_PATH", str(Path(EMBED_CACHE_PATH).with_suffix(".npy")))  # mmap-shared
+QUANTIZE_EMBEDS = os.getenv("QUANTIZE_EMBEDS", "0") == "1"  # Keep corpus embeddings as int8 + per-row scale
+USE_HNSW = os.getenv("USE_HNSW", "0") == "1"  # Approximate NN search via hnswlib instead of brute force
+HNSW_INDEX_PATH = os.getenv("HNSW_INDEX_PATH", str(Path(EMBED_CACHE_PATH).with_suffix(".hnsw")))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))  # 0 disables the query->answer cache
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # Min cosine sim for a hit
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))  # 0 disables the exact-match LLM response cache
+
+# System message shared by every chat completion. Built once and kept as the
+# constant first message so the provider can cache the prompt prefix.
+_SYSTEM_PROMPT = (
+    "Answer ONLY from the context, concisely, citing every relevant source filename "
+    "from its [From ...] header; if the context is insufficient, say so."
+)
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# Sampling settings shared by every chat completion (real-time, streaming, and batch)
+_LLM_PARAMS = {
+    "temperature": 0.1,  # Low temperature for more deterministic answers
+    "max_tokens": 300,
+    "stop": ["\n\n---"],  # Don't run on into a made-up context block
+}
+
+# Sentence boundary: whitespace following ., ?, ! or a newline
+_SENT_RE = re.compile(r'(?<=[.!?\n])\s+')
 
 # --- OpenAI Client Initialization ---
 def _get_api_key() -> str:
@@ -47,12 +88,37 @@ def _get_api_key() -> str:
     return key.strip()
 
 _API_KEY = _get_api_key()
-client = OpenAI(api_key=_API_KEY)
+aclient = AsyncOpenAI(api_key=_API_KEY)  # Query-time client, used from the serving event loop
+
+# --- Global State (populated by preload()) ---
+# Chunks are stored struct-of-arrays: one text buffer plus flat index arrays
+_TEXT_BUF: str = ""  # All chunk texts, concatenated
+_OFFSETS: np.ndarray = np.zeros(1, dtype=np.int32)  # shape: (N+1,), chunk i is _TEXT_BUF[_OFFSETS[i]:_OFFSETS[i+1]]
+_SOURCE_IDS: np.ndarray = np.zeros(0, dtype=np.int32)  # shape: (N,), index into _SOURCE_TABLE per chunk
+_SOURCE_TABLE: List[str] = []  # Distinct source filenames
+_CHUNK_EMBEDS: np.ndarray | None = None  # shape: (N, embedding_dim), L2-normalized rows (int8 if quantized)
+_CHUNK_SCALES: np.ndarray | None = None  # shape: (N,), per-row dequantization scale when QUANTIZE_EMBEDS
+_ANN_INDEX = None  # hnswlib.Index over the chunk embeddings when USE_HNSW
+_SIM_OUT: np.ndarray | None = None  # shape: (N,), reused per-query similarity buffer
+_DEQUANT_SCRATCH: np.ndarray | None = None  # shape: (_DEQUANT_BLOCK_ROWS, d), reused when QUANTIZE_EMBEDS
+_DEQUANT_BLOCK_ROWS = 512  # int8 rows dequantized per block (~3 MB of float32 at d=1536)
 
-# --- Global State (populated at module load) ---
-_CHUNKS: List[str] = []
-_SOURCES: List[str] = []  # Source filename for each chunk
-_CHUNK_EMBEDS: np.ndarray | None = None  # shape: (N, embedding_dim)
+# Semantic cache: recent normalized query embeddings -> answers, LRU-evicted
+_Q_CACHE_VECS: np.ndarray | None = None  # shape: (SEMANTIC_CACHE_SIZE, embedding_dim)
+_Q_CACHE_ANS: List[Dict[str, object]] = []  # Cached result per occupied slot
+_Q_CACHE_TOPK: List[int] = []  # top_k each cached answer was generated with
+_Q_CACHE_USED: List[int] = []  # Last-use tick per slot, for LRU eviction
+_Q_CACHE_TICK = 0
+_Q_CACHE_LOCK = threading.Lock()
+
+# Exact-match LLM cache: sha256(model + prompts) -> answer, LRU-evicted
+_LLM_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_LLM_CACHE_LOCK = threading.Lock()
+
+# Background initialization (see preload_in_background)
+_READY = threading.Event()  # Set once preload() has finished, successfully or not
+_PRELOAD_THREAD: threading.Thread | None = None
+_PRELOAD_ERROR: BaseException | None = None
 
 
 # ============================================================================
@@ -65,6 +131,7 @@ def _chunk_text(text: str, size: int = CHUNK_SIZE) -> List[str]:
     
     Strategy: Split on sentence boundaries where possible, otherwise hard-split.
     This preserves readability while keeping chunks near the target size.
+    Chunks are slices of the original text, so inner whitespace is preserved.
     """
     if not text or not text.strip():
         return []
@@ -72,27 +139,24 @@ def _chunk_text(text: str, size: int = CHUNK_SIZE) -> List[str]:
     text = text.strip()
     chunks = []
     
-    # Simple approach: split by sentences first, then combine/split to target size
-    # Sentence delimiters: ., ?, !, newlines
-    import re
-    sentences = re.split(r'(?<=[.!?\n])\s+', text)
+    # Walk sentence boundaries, tracking the current chunk as text[start:end]
+    # instead of building it up by string concatenation
+    start = 0  # Start of the current chunk
+    end = 0  # End of the last sentence added to the current chunk
+    sentence_start = 0  # Start of the sentence after the last boundary
+    for match in _SENT_RE.finditer(text):
+        # The sentence is text[<previous boundary>:match.start()]
+        if end > start and match.start() - start > size:
+            chunks.append(text[start:end].strip())
+            start = sentence_start
+        end = match.start()
+        sentence_start = match.end()
     
-    current_chunk = ""
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-            
-        # If adding this sentence exceeds size and we have content, save current chunk
-        if current_chunk and len(current_chunk) + len(sentence) + 1 > size:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            current_chunk = current_chunk + " " + sentence if current_chunk else sentence
-    
-    # Don't forget the last chunk
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+    # Don't forget the last sentence/chunk
+    if end > start and len(text) - start > size:
+        chunks.append(text[start:end].strip())
+        start = sentence_start
+    chunks.append(text[start:].strip())
     
     # Handle case where a single sentence is longer than chunk size
     final_chunks = []
@@ -123,10 +187,12 @@ def _load_and_chunk_faqs(faq_dir: str) -> Tuple[List[str], List[str]]:
     if not md_files:
         raise ValueError(f"No .md files found in {faq_dir}")
     
-    for md_file in md_files:
-        content = md_file.read_text(encoding="utf-8")
-        filename = md_file.name
-        
+    # Reads are I/O-bound (and slow on network storage), so overlap them;
+    # map() keeps results in sorted file order
+    with ThreadPoolExecutor(max_workers=min(16, len(md_files))) as executor:
+        contents = list(executor.map(lambda p: (p.name, p.read_text(encoding="utf-8")), md_files))
+    
+    for filename, content in contents:
         chunks = _chunk_text(content, CHUNK_SIZE)
         all_chunks.extend(chunks)
         all_sources.extend([filename] * len(chunks))
@@ -134,6 +200,44 @@ def _load_and_chunk_faqs(faq_dir: str) -> Tuple[List[str], List[str]]:
     return all_chunks, all_sources
 
 
+def _batch_texts(texts: List[str]) -> List[List[str]]:
+    """
+    Partition texts into sub-batches that respect the embeddings API limits.
+    Each batch holds at most EMBED_BATCH_SIZE inputs and ~EMBED_BATCH_CHARS characters.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_chars = 0
+    
+    for text in texts:
+        if current and (len(current) >= EMBED_BATCH_SIZE or current_chars + len(text) > EMBED_BATCH_CHARS):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text)
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _embed_batches(texts: List[str], embed_client: AsyncOpenAI) -> np.ndarray:
+    """
+    Embed all sub-batches concurrently and concatenate them in submission order.
+    Returns a (N, embedding_dim) numpy array of float32.
+    """
+    tasks = [
+        embed_client.embeddings.create(model=EMBED_MODEL, input=batch)
+        for batch in _batch_texts(texts)
+    ]
+    responses = await asyncio.gather(*tasks)
+    
+    # gather() preserves task order, so rows line up with the input texts
+    embeddings = [item.embedding for response in responses for item in response.data]
+    return np.array(embeddings, dtype=np.float32)
+
+
 def _embed_texts(texts: List[str]) -> np.ndarray:
     """
     Create embeddings for a list of texts using OpenAI's embedding model.
@@ -142,85 +246,533 @@ def _embed_texts(texts: List[str]) -> np.ndarray:
     if not texts:
         return np.array([], dtype=np.float32)
     
-    # OpenAI API supports batching up to 2048 inputs
-    response = client.embeddings.create(
-        model=EMBED_MODEL,
-        input=texts
-    )
+    # Split into provider-sized batches and send them concurrently (~1 RTT wall time).
+    # Uses a short-lived client bound to this call's event loop, so preload (which
+    # runs its own loop) never shares connections with `aclient`.
+    async def _run() -> np.ndarray:
+        async with AsyncOpenAI(api_key=_API_KEY) as batch_client:
+            return await _embed_batches(texts, batch_client)
     
-    # Extract embeddings in order
-    embeddings = [item.embedding for item in response.data]
-    return np.array(embeddings, dtype=np.float32)
+    return asyncio.run(_run())
+
+
+def _chunk_hash(chunk: str) -> str:
+    """Stable cache key for a chunk's embedding."""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _load_embed_cache(cache_path: str) -> Dict[str, np.ndarray]:
+    """
+    Load persisted chunk embeddings as {sha256(chunk): vector}.
+    Returns an empty dict if the cache is missing, unreadable, or was built
+    with a different EMBED_MODEL.
+    """
+    path = Path(cache_path)
+    if not path.exists():
+        return {}
+    
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["model"]) != EMBED_MODEL:
+                return {}
+            return dict(zip(data["keys"].tolist(), data["vectors"]))
+    except Exception as e:
+        print(f"[RAG] Ignoring unreadable embedding cache {path}: {e}", file=sys.stderr)
+        return {}
+
+
+def _read_umask() -> int:
+    """Current process umask (os.umask can only be read by setting it)."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Mode a plain open() would create files with; read once at import because
+# reading the umask briefly changes it for every thread in the process
+_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def _atomic_write(path: Path, write: Callable[[str], None]) -> None:
+    """
+    Write a file atomically: `write` fills a temp file in the same directory,
+    which is then renamed over `path`. The temp file is removed if anything fails.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_name)
+        # mkstemp creates 0600 files; give caches the usual umask-based mode so
+        # a server running as another account can still read them
+        os.chmod(tmp_name, _FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _save_embed_cache(cache_path: str, cache: Dict[str, np.ndarray]) -> None:
+    """
+    Persist chunk embeddings atomically (write to a temp file, then rename).
+    Failures are reported but never fatal; the cache is only an optimization.
+    """
+    path = Path(cache_path)
+    keys = list(cache.keys())
+    vectors = np.stack([cache[k] for k in keys]).astype(np.float32)
+    
+    def _write(tmp_name: str) -> None:
+        # Pass a file object: given a path, savez_compressed would append ".npz"
+        with open(tmp_name, "wb") as f:
+            np.savez_compressed(f, model=np.array(EMBED_MODEL), keys=np.array(keys), vectors=vectors)
+    
+    try:
+        _atomic_write(path, _write)
+    except (OSError, ValueError) as e:
+        print(f"[RAG] Could not write embedding cache {path}: {e}", file=sys.stderr)
+
+
+def _embed_chunks_cached(chunks: List[str]) -> np.ndarray:
+    """
+    Embed chunks, reusing vectors persisted at EMBED_CACHE_PATH.
+    Only cache misses are sent to the API; the cache is rewritten to cover
+    exactly the current corpus whenever anything changed.
+    """
+    cache = _load_embed_cache(EMBED_CACHE_PATH)
+    keys = [_chunk_hash(c) for c in chunks]
+    
+    misses = [i for i, k in enumerate(keys) if k not in cache]
+    if misses:
+        print(f"[RAG] Embedding {len(misses)} new chunks ({len(chunks) - len(misses)} cached)", file=sys.stderr)
+        new_vecs = _embed_texts([chunks[i] for i in misses])
+        for i, vec in zip(misses, new_vecs):
+            cache[keys[i]] = vec
+    else:
+        print(f"[RAG] All {len(chunks)} chunk embeddings loaded from cache", file=sys.stderr)
+    
+    if not chunks:
+        return np.empty((0, 0), dtype=np.float32)
+    
+    current = {k: cache[k] for k in keys}
+    if misses or len(current) != len(cache):
+        _save_embed_cache(EMBED_CACHE_PATH, current)
+    
+    return np.stack([current[k] for k in keys]).astype(np.float32)
+
+
+def _share_matrix(matrix: np.ndarray, matrix_path: str) -> np.ndarray:
+    """
+    Back the final corpus matrix by a memory-mapped .npy file, so that every
+    worker process maps the same page-cache pages instead of holding its own copy.
+    An identical existing file is reused as-is; otherwise it is rewritten atomically.
+    Falls back to the in-memory matrix if the file cannot be written.
+    """
+    path = Path(matrix_path)
+    try:
+        if path.exists():
+            existing = np.load(path, mmap_mode="r")
+            if existing.shape == matrix.shape and existing.dtype == matrix.dtype and np.array_equal(existing, matrix):
+                return existing
+        
+        def _write(tmp_name: str) -> None:
+            # Pass a file object: given a path, np.save would append ".npy"
+            with open(tmp_name, "wb") as f:
+                np.save(f, matrix)
+        
+        _atomic_write(path, _write)
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        print(f"[RAG] Could not memory-map embeddings via {path}: {e}", file=sys.stderr)
+        return matrix
 
 
-def _embed_query(query: str) -> np.ndarray:
+async def _embed_query(query: str) -> np.ndarray:
     """
     Create an embedding for a single query string.
     Returns a (embedding_dim,) numpy vector of float32.
     """
-    response = client.embeddings.create(
+    response = await aclient.embeddings.create(
         model=EMBED_MODEL,
         input=[query]
     )
     return np.array(response.data[0].embedding, dtype=np.float32)
 
 
-def _cosine_similarity(embeddings: np.ndarray, query_vec: np.ndarray) -> np.ndarray:
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row of a (N, d) matrix once, so that query-time
+    cosine similarity reduces to a single matrix-vector product.
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.ascontiguousarray(embeddings / (norms + 1e-9), dtype=np.float32)
+
+
+def _quantize_rows(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization of a (N, d) float matrix.
+    Returns (quantized (N, d) int8, scales (N,) float32) with row ~= quantized * scale.
+    """
+    scales = np.abs(embeddings).max(axis=1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0  # Avoid dividing all-zero rows by zero
+    quantized = np.round(embeddings / scales).astype(np.int8)
+    return quantized, scales.squeeze(axis=1).astype(np.float32)
+
+
+def _dequantized_dot(
+    quantized: np.ndarray,
+    scales: np.ndarray,
+    queries: np.ndarray,
+    out: np.ndarray,
+    scratch: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Compute (quantized * scales[:, None]) @ queries into `out` without
+    materializing the float32 matrix: NumPy has no int8 matmul, so rows are
+    upcast one block at a time into `scratch` (allocated if not given).
+    `queries` is (d,) or (d, M); `out` is (N,) or (N, M) float32.
+    """
+    if scratch is None:
+        scratch = np.empty((min(_DEQUANT_BLOCK_ROWS, quantized.shape[0]), quantized.shape[1]), dtype=np.float32)
+    block = scratch.shape[0]
+    
+    for start in range(0, quantized.shape[0], block):
+        stop = min(start + block, quantized.shape[0])
+        rows = scratch[:stop - start]
+        np.copyto(rows, quantized[start:stop], casting="unsafe")
+        np.dot(rows, queries, out=out[start:stop])
+    
+    # Per-row scale factors out of the dot product: (q_i * s_i) . x = s_i * (q_i . x)
+    out *= scales if out.ndim == 1 else scales[:, None]
+    return out
+
+
+def _cosine_similarity(
+    embeddings: np.ndarray,
+    query_vec: np.ndarray,
+    scales: np.ndarray | None = None,
+    out: np.ndarray | None = None
+) -> np.ndarray:
     """
     Compute cosine similarity between each row in embeddings and query_vec.
-    Assumes embeddings is (N, d) and query_vec is (d,).
+    Assumes embeddings is (N, d) and query_vec is (d,), both L2-normalized.
+    If embeddings are int8-quantized, pass their per-row scales to dequantize.
+    `out` is an optional (N,) float32 buffer that is overwritten and returned
+    instead of allocating a new array.
     Returns (N,) similarity scores.
     """
-    # Normalize embeddings and query
-    emb_norm = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9)
-    query_norm = query_vec / (np.linalg.norm(query_vec) + 1e-9)
+    query_vec = np.ascontiguousarray(query_vec, dtype=np.float32)
+    
+    if scales is not None:
+        if out is None:
+            out = np.empty(embeddings.shape[0], dtype=np.float32)
+        return _dequantized_dot(embeddings, scales, query_vec, out, _DEQUANT_SCRATCH)
     
-    # Dot product gives cosine similarity for normalized vectors
-    return emb_norm @ query_norm
+    if out is not None and embeddings.dtype == np.float32:
+        if _sgemv is not None:
+            # embeddings.T is a Fortran-ordered view, so BLAS reads it in place (trans=1)
+            return _sgemv(1.0, embeddings.T, query_vec, beta=0.0, y=out, overwrite_y=1, trans=1)
+        return np.dot(embeddings, query_vec, out=out)
+    
+    return embeddings @ query_vec
 
 
-def _generate_answer(context: str, question: str, source_files: List[str]) -> str:
+def _build_ann_index(embeddings: np.ndarray, chunk_keys: List[str]):
+    """
+    Build (or load from HNSW_INDEX_PATH) an HNSW index over normalized embeddings.
+    A persisted index is reused only if it was built for the exact same chunks
+    and EMBED_MODEL; otherwise it is rebuilt and saved.
+    """
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise RuntimeError("USE_HNSW=1 requires the 'hnswlib' package") from e
+    
+    n, dim = embeddings.shape
+    fingerprint = hashlib.sha256("\n".join([EMBED_MODEL, *chunk_keys]).encode("utf-8")).hexdigest()
+    index_path = Path(HNSW_INDEX_PATH)
+    key_path = index_path.with_name(index_path.name + ".key")
+    
+    index = hnswlib.Index(space="cosine", dim=dim)
+    if index_path.exists() and key_path.exists() and key_path.read_text().strip() == fingerprint:
+        index.load_index(str(index_path), max_elements=n)
+        print(f"[RAG] Loaded HNSW index from {index_path}", file=sys.stderr)
+    else:
+        index.init_index(max_elements=n, ef_construction=200, M=16)
+        index.add_items(embeddings, np.arange(n))
+        try:
+            # Atomic writes: another worker may be loading these files concurrently.
+            # The key goes last, so a matching key always refers to a complete index.
+            _atomic_write(index_path, index.save_index)
+            _atomic_write(key_path, lambda tmp_name: Path(tmp_name).write_text(fingerprint))
+        except (OSError, RuntimeError) as e:
+            print(f"[RAG] Could not write HNSW index {index_path}: {e}", file=sys.stderr)
+        print(f"[RAG] Built HNSW index over {n} chunks", file=sys.stderr)
+    
+    index.set_ef(50)
+    return index
+
+
+def _top_k_indices(query_vec: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Return indices of the top_k chunks most similar to query_vec,
+    highest similarity first. Uses the HNSW index when one is loaded.
+    """
+    k = min(top_k, len(_SOURCE_IDS))
+    
+    if _ANN_INDEX is not None:
+        labels, _ = _ANN_INDEX.knn_query(query_vec, k=k)
+        return labels[0].astype(np.int64)
+    
+    # _SIM_OUT is overwritten by every query; it is consumed here before control
+    # returns to the event loop, so concurrent requests never observe each other's scores
+    similarities = _cosine_similarity(_CHUNK_EMBEDS, query_vec, _CHUNK_SCALES, out=_SIM_OUT)
+    return _select_top_k(similarities, k)
+
+
+def _top_k_indices_many(query_vecs: np.ndarray, top_k: int) -> List[np.ndarray]:
+    """
+    Batched _top_k_indices for a (M, d) matrix of L2-normalized queries.
+    Scores all queries against the corpus with a single matrix-matrix product.
+    """
+    k = min(top_k, len(_SOURCE_IDS))
+    
+    if _ANN_INDEX is not None:
+        labels, _ = _ANN_INDEX.knn_query(query_vecs, k=k)
+        return list(labels.astype(np.int64))
+    
+    # (N, M) similarities: one GEMM instead of M matrix-vector products
+    queries = query_vecs.astype(np.float32).T
+    if _CHUNK_SCALES is not None:
+        similarities = np.empty((_CHUNK_EMBEDS.shape[0], queries.shape[1]), dtype=np.float32)
+        _dequantized_dot(_CHUNK_EMBEDS, _CHUNK_SCALES, queries, similarities, _DEQUANT_SCRATCH)
+    else:
+        similarities = _CHUNK_EMBEDS @ queries
+    return [_select_top_k(similarities[:, j], k) for j in range(similarities.shape[1])]
+
+
+def _select_top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, highest first: O(N) selection, then sort only the winners."""
+    # Partition the scores in place of negating them, which would allocate another N floats
+    candidates = np.argpartition(similarities, similarities.shape[0] - k)[-k:]
+    return candidates[np.argsort(-similarities[candidates])]
+
+
+def _semantic_cache_lookup(query_norm: np.ndarray, top_k: int) -> Dict[str, object] | None:
+    """
+    Return a cached answer for a near-duplicate question, or None.
+    A hit requires the same top_k and cosine similarity >= SEMANTIC_CACHE_THRESHOLD.
+    """
+    global _Q_CACHE_TICK
+    
+    with _Q_CACHE_LOCK:
+        if _Q_CACHE_VECS is None or not _Q_CACHE_ANS:
+            return None
+        
+        sims = _Q_CACHE_VECS[:len(_Q_CACHE_ANS)] @ query_norm
+        sims[np.asarray(_Q_CACHE_TOPK) != top_k] = -np.inf
+        best = int(np.argmax(sims))
+        if sims[best] < SEMANTIC_CACHE_THRESHOLD:
+            return None
+        
+        _Q_CACHE_TICK += 1
+        _Q_CACHE_USED[best] = _Q_CACHE_TICK
+        cached = _Q_CACHE_ANS[best]
+        return {"answer": cached["answer"], "sources": list(cached["sources"])}
+
+
+def _semantic_cache_store(query_norm: np.ndarray, top_k: int, result: Dict[str, object]) -> None:
+    """Insert an answer into the semantic cache, evicting the least recently used entry when full."""
+    global _Q_CACHE_VECS, _Q_CACHE_TICK
+    
+    if SEMANTIC_CACHE_SIZE <= 0:
+        return
+    
+    with _Q_CACHE_LOCK:
+        if _Q_CACHE_VECS is None:
+            _Q_CACHE_VECS = np.zeros((SEMANTIC_CACHE_SIZE, query_norm.shape[0]), dtype=np.float32)
+        
+        _Q_CACHE_TICK += 1
+        entry = {"answer": result["answer"], "sources": list(result["sources"])}
+        if len(_Q_CACHE_ANS) < SEMANTIC_CACHE_SIZE:
+            _Q_CACHE_ANS.append(entry)
+            _Q_CACHE_TOPK.append(top_k)
+            _Q_CACHE_USED.append(_Q_CACHE_TICK)
+            slot = len(_Q_CACHE_ANS) - 1
+        else:
+            slot = int(np.argmin(_Q_CACHE_USED))
+            _Q_CACHE_ANS[slot] = entry
+            _Q_CACHE_TOPK[slot] = top_k
+            _Q_CACHE_USED[slot] = _Q_CACHE_TICK
+        
+        _Q_CACHE_VECS[slot] = query_norm
+
+
+def _llm_cache_key(user_prompt: str) -> str:
+    """Exact-match cache key for an LLM call: sha256 of model and both prompts."""
+    return hashlib.sha256("\x00".join([LLM_MODEL, _SYSTEM_PROMPT, user_prompt]).encode("utf-8")).hexdigest()
+
+
+def _llm_cache_get(cache_key: str) -> str | None:
+    """Return a cached LLM answer (marking it recently used), or None."""
+    with _LLM_CACHE_LOCK:
+        answer = _LLM_CACHE.get(cache_key)
+        if answer is not None:
+            _LLM_CACHE.move_to_end(cache_key)
+        return answer
+
+
+def _llm_cache_put(cache_key: str, answer: str) -> None:
+    """Store an LLM answer, evicting least recently used entries beyond LLM_CACHE_SIZE."""
+    if LLM_CACHE_SIZE <= 0:
+        return
+    with _LLM_CACHE_LOCK:
+        _LLM_CACHE[cache_key] = answer
+        _LLM_CACHE.move_to_end(cache_key)
+        while len(_LLM_CACHE) > LLM_CACHE_SIZE:
+            _LLM_CACHE.popitem(last=False)
+
+
+def _build_messages(context: str, question: str) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for grounded, cited generation.
+    Kept short: prefill latency scales with input tokens, and the context's
+    [From file] headers already tell the model which files it can cite.
+    """
+    user_prompt = f"Context:\n{context}\n\nQuestion: {question}"
+    return [_SYSTEM_MSG, {"role": "user", "content": user_prompt}]
+
+
+async def _generate_answer(context: str, question: str) -> str:
     """
     Generate an answer using the LLM, grounded in the provided context.
     The answer must cite source files from the context.
     """
-    # Build a clear prompt for grounded generation
-    system_prompt = """You are a helpful assistant that answers questions based ONLY on the provided context.
+    messages = _build_messages(context, question)
 
-Rules:
-1. Answer the question using ONLY information from the context below.
-2. If the context doesn't contain enough information, say so.
-3. Always cite the source files in your answer (mention them by filename).
-4. Be concise and direct.
-5. If multiple sources are relevant, mention all of them."""
+    # Generation is near-deterministic at low temperature, so exact repeats reuse the answer
+    cache_key = _llm_cache_key(messages[-1]["content"])
+    cached = _llm_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-    user_prompt = f"""Context:
-{context}
+    response = await aclient.chat.completions.create(
+        model=LLM_MODEL,
+        messages=messages,
+        **_LLM_PARAMS
+    )
+    
+    answer = response.choices[0].message.content.strip()
+    _llm_cache_put(cache_key, answer)
+    return answer
 
-Question: {question}
 
-Available source files: {', '.join(sorted(set(source_files)))}
+async def _generate_answer_stream(context: str, question: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of _generate_answer: yields answer text deltas as the
+    LLM produces them. A cached answer is yielded as a single delta.
+    """
+    messages = _build_messages(context, question)
 
-Please answer the question and cite the relevant source file(s)."""
+    cache_key = _llm_cache_key(messages[-1]["content"])
+    cached = _llm_cache_get(cache_key)
+    if cached is not None:
+        yield cached
+        return
 
-    response = client.chat.completions.create(
+    stream = await aclient.chat.completions.create(
         model=LLM_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.1,  # Low temperature for more deterministic answers
-        max_tokens=500
+        messages=messages,
+        stream=True,
+        **_LLM_PARAMS
     )
     
-    return response.choices[0].message.content.strip()
+    parts: List[str] = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    
+    # Only a fully received answer is cached
+    _llm_cache_put(cache_key, "".join(parts).strip())
+
+
+async def _wait_until_ready() -> None:
+    """
+    Wait for a background preload to finish, then verify the system is initialized.
+    Raises RuntimeError if preload failed or was never started.
+    """
+    if _PRELOAD_THREAD is not None and not _READY.is_set():
+        await asyncio.to_thread(_READY.wait)
+    
+    if _PRELOAD_ERROR is not None:
+        raise RuntimeError(f"RAG system failed to initialize: {_PRELOAD_ERROR}") from _PRELOAD_ERROR
+    
+    # Ensure we're initialized
+    if _CHUNK_EMBEDS is None or len(_SOURCE_IDS) == 0:
+        raise RuntimeError("RAG system not initialized. Embeddings not loaded.")
+
+
+def _validate_query(question: str, top_k: int) -> Tuple[str, int]:
+    """Strip and validate the question, clamp top_k. Returns (question, top_k)."""
+    q = (question or "").strip()
+    if not q:
+        raise ValueError("question is required")
+    
+    # Clamp top_k to valid range
+    top_k = max(1, min(10, top_k or TOP_K_DEFAULT))
+    return q, top_k
+
+
+async def _prepare_query(question: str, top_k: int) -> Tuple[str, int, np.ndarray]:
+    """
+    Validate the question, clamp top_k, and embed the query.
+    Returns (question, top_k, L2-normalized query embedding).
+    """
+    q, top_k = _validate_query(question, top_k)
+    
+    await _wait_until_ready()
+    
+    # Embed the query
+    query_emb = await _embed_query(q)
+    query_emb = query_emb / (np.linalg.norm(query_emb) + 1e-9)
+    return q, top_k, query_emb
+
+
+def _retrieve_context(query_emb: np.ndarray, top_k: int) -> Tuple[str, List[str]]:
+    """
+    Retrieve the top_k chunks for a query embedding.
+    Returns (context string with [From file] headers, source filename per chunk).
+    """
+    # Get top-k indices (highest similarity first)
+    return _build_context(_top_k_indices(query_emb, top_k))
+
+
+def _build_context(top_indices: np.ndarray) -> Tuple[str, List[str]]:
+    """
+    Assemble retrieved chunks into an LLM context.
+    Returns (context string with [From file] headers, source filename per chunk).
+    """
+    # Gather context and sources
+    top_sources = [_SOURCE_TABLE[_SOURCE_IDS[i]] for i in top_indices]
+    context_parts = [
+        f"[From {source}]\n{_TEXT_BUF[_OFFSETS[i]:_OFFSETS[i + 1]]}"
+        for i, source in zip(top_indices, top_sources)
+    ]
+    context = "\n\n---\n\n".join(context_parts)
+    return context, top_sources
 
 
 # ============================================================================
 # Public API
 # ============================================================================
 
-def ask_faq_core(question: str, top_k: int = TOP_K_DEFAULT) -> Dict[str, object]:
+async def ask_faq_core(question: str, top_k: int = TOP_K_DEFAULT) -> Dict[str, object]:
     """
     Main entry point for the RAG system.
     
@@ -234,65 +786,261 @@ def ask_faq_core(question: str, top_k: int = TOP_K_DEFAULT) -> Dict[str, object]
     Raises:
         ValueError: If question is empty
     """
-    q = (question or "").strip()
-    if not q:
-        raise ValueError("question is required")
-    
-    # Clamp top_k to valid range
-    top_k = max(1, min(10, top_k or TOP_K_DEFAULT))
-    
-    # Ensure we're initialized
-    if _CHUNK_EMBEDS is None or len(_CHUNKS) == 0:
-        raise RuntimeError("RAG system not initialized. Embeddings not loaded.")
-    
-    # Embed the query
-    query_emb = _embed_query(q)
+    q, top_k, query_emb = await _prepare_query(question, top_k)
     
-    # Compute cosine similarity
-    similarities = _cosine_similarity(_CHUNK_EMBEDS, query_emb)
+    # Near-duplicate questions skip retrieval and generation entirely
+    cached = _semantic_cache_lookup(query_emb, top_k)
+    if cached is not None:
+        return cached
     
-    # Get top-k indices (highest similarity first)
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
-    
-    # Gather context and sources
-    top_sources = [_SOURCES[i] for i in top_indices]
-    context_parts = [f"[From {_SOURCES[i]}]\n{_CHUNKS[i]}" for i in top_indices]
-    context = "\n\n---\n\n".join(context_parts)
+    context, top_sources = _retrieve_context(query_emb, top_k)
     
     # Generate answer
-    answer = _generate_answer(context, q, top_sources)
+    answer = await _generate_answer(context, q)
     
     # Return distinct sources (at least 2 when available)
     distinct_sources = sorted(set(top_sources))
     
-    return {
+    result = {
         "answer": answer,
         "sources": distinct_sources
     }
+    _semantic_cache_store(query_emb, top_k, result)
+    return result
+
+
+async def ask_faq_many(questions: List[str], top_k: int = TOP_K_DEFAULT) -> List[Dict[str, object]]:
+    """
+    Answer several questions at once.
+    
+    All questions are embedded in a single API request, retrieved with one
+    matrix-matrix product, and answered with concurrent LLM calls.
+    
+    Args:
+        questions: The user's natural language questions
+        top_k: Number of top chunks to retrieve per question (default: 4)
+    
+    Returns:
+        List of dicts with 'answer' (str) and 'sources' (list of filenames),
+        in the same order as `questions`
+    
+    Raises:
+        ValueError: If no questions are given or any question is empty
+    """
+    if not questions:
+        raise ValueError("questions are required")
+    
+    validated = [_validate_query(question, top_k) for question in questions]
+    qs = [q for q, _ in validated]
+    top_k = validated[0][1]
+    
+    await _wait_until_ready()
+    
+    # One embeddings request for all questions
+    query_embs = _normalize_rows(await _embed_batches(qs, aclient))
+    
+    results: List[Dict[str, object] | None] = [
+        _semantic_cache_lookup(query_emb, top_k) for query_emb in query_embs
+    ]
+    misses = [i for i, result in enumerate(results) if result is None]
+    
+    if misses:
+        contexts = [_build_context(idx) for idx in _top_k_indices_many(query_embs[misses], top_k)]
+        answers = await asyncio.gather(*[
+            _generate_answer(context, qs[i])
+            for i, (context, _) in zip(misses, contexts)
+        ])
+        
+        for i, (_, top_sources), answer in zip(misses, contexts, answers):
+            results[i] = {"answer": answer, "sources": sorted(set(top_sources))}
+            _semantic_cache_store(query_embs[i], top_k, results[i])
+    
+    return results
+
+
+async def ask_faq_batch(
+    questions: List[str],
+    output_jsonl: str,
+    top_k: int = TOP_K_DEFAULT
+) -> Dict[str, object]:
+    """
+    Submit questions to the OpenAI Batch API for offline answering.
+    
+    Intended for non-interactive workloads (eval suites, backfills): batch
+    completions cost ~50% less and don't consume real-time rate limits, but
+    finish asynchronously within 24h. Retrieval happens now; each question
+    becomes one /v1/chat/completions request line (custom_id "question-<i>")
+    in `output_jsonl`, which is uploaded and submitted as a batch.
+    
+    Args:
+        questions: The natural language questions to answer
+        output_jsonl: Path to write the batch input JSONL file to
+        top_k: Number of top chunks to retrieve per question (default: 4)
+    
+    Returns:
+        Dict with 'batch_id', 'input_file_id', and 'sources' (distinct source
+        filenames per question, in order). Poll `aclient.batches.retrieve(batch_id)`
+        and download its output file for the answers.
+    
+    Raises:
+        ValueError: If no questions are given or any question is empty
+    """
+    if not questions:
+        raise ValueError("questions are required")
+    
+    validated = [_validate_query(question, top_k) for question in questions]
+    qs = [q for q, _ in validated]
+    top_k = validated[0][1]
+    
+    await _wait_until_ready()
+    
+    query_embs = _normalize_rows(await _embed_batches(qs, aclient))
+    contexts = [_build_context(idx) for idx in _top_k_indices_many(query_embs, top_k)]
+    
+    with open(output_jsonl, "w", encoding="utf-8") as f:
+        for i, (q, (context, _)) in enumerate(zip(qs, contexts)):
+            line = {
+                "custom_id": f"question-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": LLM_MODEL,
+                    "messages": _build_messages(context, q),
+                    **_LLM_PARAMS
+                }
+            }
+            f.write(json.dumps(line) + "\n")
+    
+    with open(output_jsonl, "rb") as f:
+        input_file = await aclient.files.create(file=f, purpose="batch")
+    
+    batch = await aclient.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"[RAG] Submitted batch {batch.id} with {len(qs)} questions", file=sys.stderr)
+    
+    return {
+        "batch_id": batch.id,
+        "input_file_id": input_file.id,
+        "sources": [sorted(set(top_sources)) for _, top_sources in contexts]
+    }
+
+
+async def ask_faq_stream(question: str, top_k: int = TOP_K_DEFAULT) -> Tuple[AsyncIterator[str], List[str]]:
+    """
+    Streaming entry point for the RAG system.
+    
+    Validation, embedding, and retrieval happen eagerly, so errors surface
+    before any output is sent; only generation is deferred to the iterator.
+    
+    Args:
+        question: The user's natural language question
+        top_k: Number of top chunks to retrieve (default: 4)
+    
+    Returns:
+        Tuple of (async iterator of answer text deltas, list of distinct source filenames)
+    
+    Raises:
+        ValueError: If question is empty
+    """
+    q, top_k, query_emb = await _prepare_query(question, top_k)
+    
+    cached = _semantic_cache_lookup(query_emb, top_k)
+    if cached is not None:
+        async def _replay() -> AsyncIterator[str]:
+            yield cached["answer"]
+        return _replay(), cached["sources"]
+    
+    context, top_sources = _retrieve_context(query_emb, top_k)
+    distinct_sources = sorted(set(top_sources))
+    
+    async def _deltas() -> AsyncIterator[str]:
+        parts: List[str] = []
+        async for delta in _generate_answer_stream(context, q):
+            parts.append(delta)
+            yield delta
+        _semantic_cache_store(query_emb, top_k, {"answer": "".join(parts).strip(), "sources": distinct_sources})
+    
+    return _deltas(), distinct_sources
 
 
 # ============================================================================
 # Module Initialization
 # ============================================================================
 
-def _preload() -> None:
+def _pack_chunks(chunks: List[str], sources: List[str]) -> Tuple[str, np.ndarray, np.ndarray, List[str]]:
+    """
+    Pack parallel chunk/source lists into the struct-of-arrays layout.
+    Returns (text buffer, (N+1,) int32 offsets, (N,) int32 source ids, source table).
+    """
+    source_table = sorted(set(sources))
+    source_index = {source: i for i, source in enumerate(source_table)}
+    
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum(np.fromiter((len(c) for c in chunks), dtype=np.int64, count=len(chunks)))
+    source_ids = np.fromiter((source_index[s] for s in sources), dtype=np.int32, count=len(sources))
+    return "".join(chunks), offsets, source_ids, source_table
+
+
+def preload() -> None:
     """
     Load FAQs, compute embeddings, and initialize global state.
-    Called automatically at module import time.
+    Must be called once per process before asking questions (the API server
+    does this in its lifespan handler, the MCP server and CLI at startup).
     """
-    global _CHUNKS, _SOURCES, _CHUNK_EMBEDS
+    global _TEXT_BUF, _OFFSETS, _SOURCE_IDS, _SOURCE_TABLE, _CHUNK_EMBEDS, _CHUNK_SCALES, _ANN_INDEX, _SIM_OUT
+    global _DEQUANT_SCRATCH
     
-    print(f"[RAG] Loading FAQs from: {FAQ_DIR}")
-    _CHUNKS, _SOURCES = _load_and_chunk_faqs(FAQ_DIR)
-    print(f"[RAG] Loaded {len(_CHUNKS)} chunks from {len(set(_SOURCES))} files")
+    print(f"[RAG] Loading FAQs from: {FAQ_DIR}", file=sys.stderr)
+    chunks, sources = _load_and_chunk_faqs(FAQ_DIR)
+    _TEXT_BUF, _OFFSETS, _SOURCE_IDS, _SOURCE_TABLE = _pack_chunks(chunks, sources)
+    print(f"[RAG] Loaded {len(chunks)} chunks from {len(_SOURCE_TABLE)} files", file=sys.stderr)
     
-    print(f"[RAG] Computing embeddings with {EMBED_MODEL}...")
-    _CHUNK_EMBEDS = _embed_texts(_CHUNKS)
-    print(f"[RAG] Embeddings ready: shape {_CHUNK_EMBEDS.shape}")
+    print(f"[RAG] Computing embeddings with {EMBED_MODEL}...", file=sys.stderr)
+    _CHUNK_EMBEDS = _normalize_rows(_embed_chunks_cached(chunks))
+    
+    if USE_HNSW:
+        # Built from the float32 vectors, before any quantization
+        _ANN_INDEX = _build_ann_index(_CHUNK_EMBEDS, [_chunk_hash(c) for c in chunks])
+    
+    if QUANTIZE_EMBEDS:
+        _CHUNK_EMBEDS, _CHUNK_SCALES = _quantize_rows(_CHUNK_EMBEDS)
+        _DEQUANT_SCRATCH = np.empty(
+            (max(1, min(_DEQUANT_BLOCK_ROWS, _CHUNK_EMBEDS.shape[0])), _CHUNK_EMBEDS.shape[1]), dtype=np.float32
+        )
+    
+    if _CHUNK_EMBEDS.size:
+        _CHUNK_EMBEDS = _share_matrix(_CHUNK_EMBEDS, EMBED_MATRIX_PATH)
+    _SIM_OUT = np.empty(len(chunks), dtype=np.float32)
+    print(f"[RAG] Embeddings ready: shape {_CHUNK_EMBEDS.shape}, dtype {_CHUNK_EMBEDS.dtype}", file=sys.stderr)
+    _READY.set()
 
 
-# Auto-initialize on import
-_preload()
+def preload_in_background() -> None:
+    """
+    Start preload() on a daemon thread and return immediately.
+    Lets a process start serving (health checks, tool listing) while embeddings
+    load; queries wait for it to finish. Calling it again is a no-op.
+    """
+    global _PRELOAD_THREAD
+    
+    if _PRELOAD_THREAD is not None:
+        return
+    
+    def _run() -> None:
+        global _PRELOAD_ERROR
+        try:
+            preload()
+        except BaseException as e:
+            _PRELOAD_ERROR = e
+            print(f"[RAG] Preload failed: {e}", file=sys.stderr)
+        finally:
+            _READY.set()
+    
+    _PRELOAD_THREAD = threading.Thread(target=_run, name="rag-preload", daemon=True)
+    _PRELOAD_THREAD.start()
 
 
 # ============================================================================
@@ -301,18 +1049,26 @@ _preload()
 
 def main_cli():
     """Simple CLI for testing the RAG system."""
+    preload()
+    
+    # One event loop for the whole session, so `aclient` keeps its connections
+    asyncio.run(_cli_session())
+
+
+async def _cli_session():
+    """Interactive question loop for main_cli."""
     print("\n=== FAQ RAG CLI ===")
     print("Type 'quit' to exit.\n")
     
     while True:
         try:
-            q = input("Question: ").strip()
+            q = input("Question: ").strip()  # Blocking is fine: nothing else runs on this loop
             if q.lower() in ('quit', 'exit', 'q'):
                 break
             if not q:
                 continue
             
-            result = ask_faq_core(q)
+            result = await ask_faq_core(q)
             print(f"\nAnswer: {result['answer']}")
             print(f"Sources: {', '.join(result['sources'])}\n")
         except KeyboardInterrupt:
@@ -0,0 +1,44 @@
+"""
+Pins the output of rag_core._chunk_text.
+
+Chunk text is hashed into the embedding cache and shown to the LLM, so any
+change here re-embeds the corpus and should be deliberate.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# rag_core lives at the repo root and reads the key at import time;
+# no API calls are made by these tests
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from rag_core import _chunk_text  # noqa: E402
+
+FAQ_DIR = Path(__file__).parent.parent / "faqs"
+
+
+def test_shipped_faq_keeps_original_whitespace():
+    text = (FAQ_DIR / "faq_auth.md").read_text(encoding="utf-8")
+    assert _chunk_text(text) == [
+        "# Auth FAQ\n\nQ: How do I reset my password?\nA: Use the reset link on the login page."
+    ]
+
+
+def test_splits_on_sentence_boundaries():
+    assert _chunk_text("One. Two. Three. Four.", 10) == ["One. Two.", "Three.", "Four."]
+
+
+def test_whitespace_runs_are_preserved_inside_chunks():
+    text = "First sentence.  Second   sentence!\n\nThird one? Fourth."
+    assert _chunk_text(text, 20) == ["First sentence.", "Second   sentence!", "Third one? Fourth."]
+
+
+def test_long_sentence_is_hard_split():
+    assert _chunk_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_blank_text_has_no_chunks():
+    assert _chunk_text("   ", 10) == []
+    assert _chunk_text("", 10) == []
@@ -0,0 +1,46 @@
+"""
+Round-trips chunks and sources through rag_core's struct-of-arrays packing.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# rag_core lives at the repo root and reads the key at import time;
+# no API calls are made by these tests
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from rag_core import _pack_chunks  # noqa: E402
+
+
+@pytest.mark.parametrize("chunks, sources", [
+    (
+        ["Q: Reset password?\nA: Use the link.", "Héllo — ünïcode.", "", "Last chunk."],
+        ["faq_auth.md", "faq_misc.md", "faq_auth.md", "faq_billing.md"],
+    ),
+    (["Only one."], ["faq_auth.md"]),
+    ([], []),
+])
+def test_pack_chunks_round_trips(chunks, sources):
+    text_buf, offsets, source_ids, source_table = _pack_chunks(chunks, sources)
+
+    assert offsets.shape == (len(chunks) + 1,)
+    assert source_ids.shape == (len(chunks),)
+    assert offsets[0] == 0 and offsets[-1] == len(text_buf)
+    assert sorted(set(source_table)) == source_table == sorted(set(sources))
+    for i in range(len(chunks)):
+        assert text_buf[offsets[i]:offsets[i + 1]] == chunks[i]
+        assert source_table[source_ids[i]] == sources[i]
+
+
+def test_empty_pack_is_empty():
+    text_buf, offsets, source_ids, source_table = _pack_chunks([], [])
+
+    assert text_buf == ""
+    assert offsets.tolist() == [0]
+    assert source_ids.dtype == np.int32 and source_ids.size == 0
+    assert source_table == []
@@ -0,0 +1,92 @@
+"""
+Covers rag_core's semantic query cache: threshold, top_k masking and LRU reuse.
+
+A hit returns an earlier answer to a different question, so these rules decide
+what users see.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# rag_core lives at the repo root and reads the key at import time;
+# no API calls are made by these tests
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import rag_core  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(rag_core, "SEMANTIC_CACHE_SIZE", 2)
+    monkeypatch.setattr(rag_core, "SEMANTIC_CACHE_THRESHOLD", 0.95)
+    monkeypatch.setattr(rag_core, "_Q_CACHE_VECS", None)
+    monkeypatch.setattr(rag_core, "_Q_CACHE_ANS", [])
+    monkeypatch.setattr(rag_core, "_Q_CACHE_TOPK", [])
+    monkeypatch.setattr(rag_core, "_Q_CACHE_USED", [])
+    monkeypatch.setattr(rag_core, "_Q_CACHE_TICK", 0)
+
+
+def _unit(*values):
+    vec = np.asarray(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def _result(answer):
+    return {"answer": answer, "sources": [f"{answer}.md"]}
+
+
+def test_hit_at_or_above_threshold():
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, _result("a"))
+
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3) == _result("a")
+    # cos = 0.96
+    assert rag_core._semantic_cache_lookup(_unit(0.96, 0.28, 0), 3) == _result("a")
+
+
+def test_miss_below_threshold():
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, _result("a"))
+
+    # cos = 0.8
+    assert rag_core._semantic_cache_lookup(_unit(0.8, 0.6, 0), 3) is None
+
+
+def test_miss_when_top_k_differs():
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, _result("a"))
+
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 5) is None
+
+
+def test_full_cache_evicts_least_recently_used():
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, _result("a"))
+    rag_core._semantic_cache_store(_unit(0, 1, 0), 3, _result("b"))
+    # Touch "a" so "b" becomes the least recently used slot
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3) == _result("a")
+
+    rag_core._semantic_cache_store(_unit(0, 0, 1), 3, _result("c"))
+
+    assert rag_core._semantic_cache_lookup(_unit(0, 1, 0), 3) is None
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3) == _result("a")
+    assert rag_core._semantic_cache_lookup(_unit(0, 0, 1), 3) == _result("c")
+
+
+def test_returned_sources_are_a_copy():
+    stored = _result("a")
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, stored)
+    stored["sources"].append("mutated-after-store.md")
+
+    hit = rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3)
+    hit["sources"].append("mutated-after-lookup.md")
+
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3) == _result("a")
+
+
+def test_disabled_cache_stores_nothing(monkeypatch):
+    monkeypatch.setattr(rag_core, "SEMANTIC_CACHE_SIZE", 0)
+    rag_core._semantic_cache_store(_unit(1, 0, 0), 3, _result("a"))
+
+    assert rag_core._semantic_cache_lookup(_unit(1, 0, 0), 3) is None
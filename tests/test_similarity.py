@@ -0,0 +1,74 @@
+"""
+Checks rag_core's scoring helpers against plain NumPy reference results.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# rag_core lives at the repo root and reads the key at import time;
+# no API calls are made by these tests
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import rag_core  # noqa: E402
+
+N, D = 23, 8  # N deliberately not a multiple of the block sizes below
+
+
+@pytest.fixture
+def quantized():
+    rng = np.random.default_rng(0)
+    return rag_core._quantize_rows(rng.standard_normal((N, D)).astype(np.float32))
+
+
+def _reference(q, s, x):
+    return (q.astype(np.float32) * s[:, None]) @ x
+
+
+@pytest.mark.parametrize("query_shape", [(D,), (D, 3)])
+@pytest.mark.parametrize("block", [1, 5, N, 64])
+def test_dequantized_dot_matches_reference(quantized, query_shape, block):
+    q, s = quantized
+    x = np.random.default_rng(1).standard_normal(query_shape).astype(np.float32)
+    out = np.empty((N,) + query_shape[1:], dtype=np.float32)
+    scratch = np.empty((min(block, N), D), dtype=np.float32)
+
+    result = rag_core._dequantized_dot(q, s, x, out, scratch)
+
+    assert result is out
+    np.testing.assert_allclose(out, _reference(q, s, x), rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("query_shape", [(D,), (D, 3)])
+def test_dequantized_dot_allocates_scratch_at_block_size(quantized, query_shape, monkeypatch):
+    monkeypatch.setattr(rag_core, "_DEQUANT_BLOCK_ROWS", 4)
+    q, s = quantized
+    x = np.random.default_rng(2).standard_normal(query_shape).astype(np.float32)
+    out = np.empty((N,) + query_shape[1:], dtype=np.float32)
+
+    rag_core._dequantized_dot(q, s, x, out)
+
+    np.testing.assert_allclose(out, _reference(q, s, x), rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("k", [1, 3, N])
+def test_select_top_k_returns_highest_scores_first(k):
+    scores = np.random.default_rng(3).standard_normal(N).astype(np.float32)
+    before = scores.copy()
+
+    top = rag_core._select_top_k(scores, k)
+
+    assert top.tolist() == np.argsort(-scores, kind="stable")[:k].tolist()
+    np.testing.assert_array_equal(scores, before)
+
+
+def test_select_top_k_on_strided_column():
+    scores = np.random.default_rng(4).standard_normal((N, 3)).astype(np.float32)
+
+    top = rag_core._select_top_k(scores[:, 1], 4)
+
+    assert top.tolist() == np.argsort(-scores[:, 1])[:4].tolist()